@@ -1,14 +1,43 @@
 #!/usr/bin/env python3
 import argparse
+import concurrent.futures
+import functools
+import hashlib
 import subprocess
 import os
+import re
 import sys
+import threading
 import shutil
-import urllib.request
-import toml
+import stat
+import http.client
+import urllib.parse
 import json
+import logging
+import mmap
 import time
 
+# Fast TOML parsing: tomllib (stdlib, 3.11+) or tomli, falling back to the
+# pure-Python toml package. Writes are done with patch_toml() and need neither.
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+        import toml
+
+try:
+    import psutil # Optional: find and wait on gaiad processes without pkill/sleep
+except ImportError:
+    psutil = None
+
+try:
+    import ijson # Optional: stream-parse RPC responses instead of loading them whole
+except ImportError:
+    ijson = None
+
 # Configuration
 DEFAULT_GENESIS_URL = "https://github.com/cosmos/testnets/raw/master/interchain-security/provider/provider-genesis.json"
 DEFAULT_BINARY = "./build/gaiad"
@@ -24,63 +53,369 @@ SEEDS = "08ec17e86dac67b9da70deb20177655495a55407@provider-seed-01.ics-testnet.p
 # Provided SYNC_RPC_SERVERS for state sync
 SYNC_RPC_SERVERS = "https://rpc.provider-state-sync-01.ics-testnet.polypore.xyz:443,https://rpc.provider-state-sync-02.ics-testnet.polypore.xyz:443"
 
+# Per-request timeout (seconds) and retry policy when querying state sync RPC servers
+RPC_TIMEOUT = 3
+RPC_ATTEMPTS = 3
+RPC_BACKOFF = 0.1 # seconds, doubled after each failed attempt
+RPC_BACKOFF_MAX = 2
+
+# Per-user cache for results that survive --clean (e.g. trust settings)
+CACHE_DIR = os.path.expanduser("~/.cache/gaia-start")
+TRUST_CACHE_PATH = os.path.join(CACHE_DIR, "trust_cache.json")
+TRUST_CACHE_TTL = 60 # seconds
+
+log = logging.getLogger("start_node")
+
 def run_command(cmd, shell=False, check=True):
     """Runs a shell command."""
-    print(f"Running: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+    log.info(f"Running: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
     try:
         subprocess.run(cmd, shell=shell, check=check, text=True)
     except subprocess.CalledProcessError as e:
-        print(f"Error executing command: {e}")
+        log.error(f"Error executing command: {e}")
         sys.exit(1)
 
-def increment_port(addr, offset):
-    """Increments the port in a 'tcp://host:port' or 'host:port' string."""
-    if not addr or offset == 0:
-        return addr
-    
-    prefix = ""
-    if "://" in addr:
-        prefix, addr = addr.split("://")
-        prefix += "://"
-        
+def _stat(path):
+    """Returns os.stat(path), or None if the path does not exist or cannot be stat'ed (like os.path.exists)."""
     try:
-        host, port = addr.rsplit(":", 1)
-        new_port = int(port) + offset
-        return f"{prefix}{host}:{new_port}"
-    except ValueError:
-        return f"{prefix}{addr}" # Return original if parsing fails
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+def _remove_entry(entry):
+    """Removes a single os.DirEntry, recursing into directories."""
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path)
+    else:
+        os.unlink(entry.path)
+
+def remove_tree(path, max_workers=8):
+    """Recursively deletes `path`.
+
+    Node state lives one level down (data/application.db, data/blockstore.db, ...),
+    so the entries of each subdirectory are removed concurrently before the
+    remaining skeleton is deleted.
+    """
+    if os.path.islink(path):
+        # Never fan out into a symlink target; let rmtree refuse it up front as before
+        shutil.rmtree(path)
+        return
+
+    entries = []
+    with os.scandir(path) as top:
+        for entry in top:
+            if entry.is_dir(follow_symlinks=False):
+                with os.scandir(entry.path) as sub:
+                    entries.extend(sub)
+
+    if len(entries) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_remove_entry, entries)) # Re-raises the first failure
+    shutil.rmtree(path)
+
+_PORT_RE = re.compile(r'^(?P<prefix>[a-z]+://)?(?P<host>.*):(?P<port>\d+)$')
+
+def file_matches(path, pattern):
+    """Returns whether the bytes regex `pattern` matches the file at `path`, scanning it through mmap."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return pattern.search(mm) is not None
+
+def batch_increment_ports(addrs, offset):
+    """Increments the port in each 'tcp://host:port' or 'host:port' string of `addrs`.
+
+    Returns a new list; empty or unparseable addresses are returned unchanged.
+    """
+    if offset == 0:
+        return list(addrs)
+    result = []
+    for addr in addrs:
+        m = _PORT_RE.match(addr) if addr else None
+        result.append(f"{m['prefix'] or ''}{m['host']}:{int(m['port']) + offset}" if m else addr)
+    return result
+
+def stop_gaiad_processes(timeout=3):
+    """Terminates running gaiad processes, returning as soon as they exit (or after `timeout` seconds)."""
+    if psutil is not None:
+        procs = [p for p in psutil.process_iter(['name']) if p.info['name'] == 'gaiad']
+        for p in procs:
+            try:
+                p.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(procs, timeout=timeout)
+        for p in alive:
+            try:
+                p.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return
+
+    # pkill exits 1 when nothing matched, in which case there is nothing to wait for
+    if subprocess.run(["pkill", "gaiad"], check=False).returncode != 0:
+        return
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if subprocess.run(["pgrep", "gaiad"], stdout=subprocess.DEVNULL, check=False).returncode != 0:
+            return
+        time.sleep(0.1)
+
+@functools.lru_cache(maxsize=4)
+def _get_help_text(binary_path, mtime_ns):
+    """Returns the output of `<binary> start --help`, cached in CACHE_DIR until the binary changes."""
+    binary_id = hashlib.sha256(os.path.realpath(binary_path).encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"help-{binary_id}-{mtime_ns}.txt")
+    try:
+        with open(cache_path, 'r') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    # Run help command to get supported backends
+    result = subprocess.run(
+        [binary_path, "start", "--help"], 
+        capture_output=True, 
+        text=True, 
+        check=False
+    )
+    if result.returncode == 0:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w') as f:
+                f.write(result.stdout)
+        except OSError as e:
+            log.warning(f"Warning: Could not write help text cache: {e}")
+    return result.stdout
+
+_TOML_TABLE_RE = re.compile(r'^\s*\[\s*([^\[\]]+?)\s*\]\s*(?:#.*)?$')
+_TOML_KEY_RE = re.compile(r'^(\s*)([A-Za-z0-9_-]+)(\s*=\s*)')
+
+def parse_toml(text):
+    """Parses a TOML document into a dict."""
+    if tomllib is not None:
+        return tomllib.loads(text)
+    return toml.loads(text)
+
+def format_toml_value(value):
+    """Formats a bool, int or str as a TOML value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    return json.dumps(str(value)) # JSON string escapes are valid TOML basic-string escapes
+
+def get_toml_values(text, keys):
+    """Returns {(table, key): value} for the single-line `keys` found in `text`.
+
+    Only the matching lines are parsed, not the whole document.
+    """
+    wanted = set(keys)
+    values = {}
+    table = ""
+    for line in text.splitlines():
+        m = _TOML_TABLE_RE.match(line)
+        if m:
+            table = m.group(1)
+            continue
+        m = _TOML_KEY_RE.match(line)
+        if m and (table, m.group(2)) in wanted:
+            values[(table, m.group(2))] = parse_toml(line)[m.group(2)]
+    return values
+
+def write_file_atomic(path, text):
+    """Writes `text` to `path` via a temporary file and os.replace, so readers never see a partial file.
+
+    Symlinks are resolved and the original file mode is kept (gaiad writes app.toml as 0600).
+    """
+    path = os.path.realpath(path)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def patch_toml(text, updates):
+    """Returns `text` with the `key = value` lines named in `updates` rewritten in place.
+
+    `updates` maps (table, key) to the new value, with table "" for top-level keys.
+    Everything else, including comments, is left untouched. Keys missing from
+    the document are appended to the end of their table.
+    """
+    pending = dict(updates)
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    out = []
+
+    def append_missing(table):
+        for (t, key), value in list(pending.items()):
+            if t == table:
+                out.append(f"{key} = {format_toml_value(value)}\n")
+                del pending[(t, key)]
+
+    table = ""
+    for line in lines:
+        m = _TOML_TABLE_RE.match(line)
+        if m:
+            append_missing(table)
+            table = m.group(1)
+            out.append(line)
+            continue
+        m = _TOML_KEY_RE.match(line)
+        if m and (table, m.group(2)) in pending:
+            out.append(f"{m.group(0)}{format_toml_value(pending.pop((table, m.group(2))))}\n")
+            continue
+        out.append(line)
+    append_missing(table)
+
+    for table in dict.fromkeys(t for t, _ in pending):
+        out.append(f"\n[{table}]\n")
+        append_missing(table)
+    return "".join(out)
+
+def read_json_field(stream, path):
+    """Returns the value at dotted `path` in the JSON document read from `stream`.
+
+    With ijson installed, parsing stops as soon as the field is found, so the
+    rest of a large body (e.g. a full block) is never read or decoded.
+    """
+    if ijson is not None:
+        try:
+            return next(ijson.items(stream, path))
+        except StopIteration:
+            raise KeyError(path) from None
+
+    value = json.load(stream)
+    for key in path.split('.'):
+        value = value[key]
+    return value
+
+def rpc_get_field(conn, path, field, reuse=True):
+    """GETs `path` over the open HTTP(S) connection `conn` and returns the dotted JSON `field`.
+
+    With `reuse`, the rest of the body is drained so `conn` can serve another request.
+    """
+    conn.request("GET", path)
+    with conn.getresponse() as response:
+        if response.status != 200:
+            raise http.client.HTTPException(f"GET {path} returned HTTP {response.status} {response.reason}")
+        value = read_json_field(response, field)
+        if reuse:
+            response.read()
+    return value
+
+def cache_trust_settings(func):
+    """Caches successful trust settings on disk for TRUST_CACHE_TTL seconds, keyed by RPC server set."""
+    @functools.wraps(func)
+    def wrapper(rpc_servers_str):
+        rpc_servers = sorted(rpc for rpc in rpc_servers_str.split(',') if rpc)
+        key = hashlib.sha256(",".join(rpc_servers).encode()).hexdigest()
 
+        try:
+            with open(TRUST_CACHE_PATH, 'r') as f:
+                entry = json.load(f)
+            if entry['key'] == key and time.time() - entry['ts'] < TRUST_CACHE_TTL:
+                log.info(f"Using cached trust settings from {TRUST_CACHE_PATH}")
+                return entry['height'], entry['hash']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass # Missing or unreadable cache, fetch instead
+
+        trust_height, trust_hash = func(rpc_servers_str)
+        if trust_height and trust_hash:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(TRUST_CACHE_PATH, 'w') as f:
+                    json.dump({'ts': time.time(), 'height': trust_height, 'hash': trust_hash, 'key': key}, f)
+            except OSError as e:
+                log.warning(f"Warning: Could not write trust settings cache: {e}")
+        return trust_height, trust_hash
+
+    return wrapper
+
+@cache_trust_settings
 def get_trust_settings(rpc_servers_str):
-    """Fetches trust height and hash from the first available RPC server."""
-    rpc_servers = rpc_servers_str.split(',')
-    
-    for rpc in rpc_servers:
+    """Fetches trust height and hash from the first RPC server to answer.
+
+    All servers are queried concurrently, so an unreachable server costs at
+    most one timeout instead of delaying the ones after it.
+    """
+    rpc_servers = [rpc for rpc in rpc_servers_str.split(',') if rpc]
+    if not rpc_servers:
+        log.warning("Could not fetch trust settings from any RPC server.")
+        return None, None
+
+    done = threading.Event() # Set once a result is returned, to stop pending retries
+
+    def _fetch(rpc):
+        # Retry transient failures (timeouts, 502s, dropped TLS) with exponential backoff;
+        # each server retries in its own thread, so this does not delay the others
+        for attempt in range(RPC_ATTEMPTS):
+            try:
+                return _fetch_once(rpc)
+            except Exception as e:
+                if attempt == RPC_ATTEMPTS - 1 or done.is_set():
+                    raise
+                delay = min(RPC_BACKOFF_MAX, RPC_BACKOFF * 2 ** attempt)
+                log.warning(f"Attempt {attempt + 1} to fetch trust settings from {rpc} failed ({e}), retrying in {delay:.1f}s...")
+                if done.wait(delay):
+                    raise # Another server already answered
+
+    def _fetch_once(rpc):
+        log.info(f"Fetching trust settings from {rpc}...")
+        # Both requests share one keep-alive connection, so only /status pays the TCP/TLS handshake
+        url = urllib.parse.urlsplit(rpc)
+        conn_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(url.netloc, timeout=RPC_TIMEOUT)
+        base_path = url.path.rstrip('/')
         try:
-            print(f"Fetching trust settings from {rpc}...")
             # Get status to find latest height
-            with urllib.request.urlopen(f"{rpc}/status") as response:
-                status = json.loads(response.read().decode())
-                latest_height = int(status['result']['sync_info']['latest_block_height'])
-            
+            latest_height = int(rpc_get_field(conn, f"{base_path}/status", 'result.sync_info.latest_block_height'))
+
             # Use a height 2000 blocks back to be safe (must be within trusting period)
             trust_height = latest_height - 2000
             if trust_height <= 0:
-                print(f"Chain too young ({latest_height}), skipping {rpc}")
+                log.info(f"Chain too young ({latest_height}), skipping {rpc}")
+                return None
+
+            # Get hash for the trust height (last request, so the rest of the block is never read)
+            trust_hash = rpc_get_field(conn, f"{base_path}/block?height={trust_height}", 'result.block_id.hash', reuse=False)
+        finally:
+            conn.close()
+
+        return trust_height, trust_hash
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(rpc_servers))
+    try:
+        futures = {executor.submit(_fetch, rpc): rpc for rpc in rpc_servers}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                log.warning(f"Failed to fetch trust settings from {futures[future]}: {e}")
                 continue
+            if result:
+                return result
+    finally:
+        done.set()
+        executor.shutdown(wait=False, cancel_futures=True)
 
-            # Get hash for the trust height
-            with urllib.request.urlopen(f"{rpc}/block?height={trust_height}") as response:
-                block_data = json.loads(response.read().decode())
-                trust_hash = block_data['result']['block_id']['hash']
-            
-            return trust_height, trust_hash
-        except Exception as e:
-            print(f"Failed to fetch trust settings from {rpc}: {e}")
-    
-    print("Could not fetch trust settings from any RPC server.")
+    log.warning("Could not fetch trust settings from any RPC server.")
     return None, None
 
 def main():
+    # One handler for all script output; it flushes every record so messages stay
+    # in order with the output of the gaiad subprocesses sharing the terminal
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     parser = argparse.ArgumentParser(description="Start a Gaia testnet node with a specific DB backend.")
     
     # Temporarily add "treedb" to choices to allow custom handling before argparse validation
@@ -125,54 +460,48 @@ def main():
 
     args = parser.parse_args()
 
-    # Check if binary exists
-    if not os.path.isfile(args.binary):
-        print(f"Error: Binary not found at {args.binary}")
-        print("Please build it first (e.g., 'make build') or provide the correct path.")
+    # Check if binary exists (the stat result is reused to key the help-text cache)
+    binary_stat = _stat(args.binary)
+    if binary_stat is None or not stat.S_ISREG(binary_stat.st_mode):
+        log.error(f"Error: Binary not found at {args.binary}")
+        log.error("Please build it first (e.g., 'make build') or provide the correct path.")
         sys.exit(1)
 
     # Dynamic check for backend support
     def check_backend_support(binary_path, backend):
         try:
-            # Run help command to get supported backends
-            result = subprocess.run(
-                [binary_path, "start", "--help"], 
-                capture_output=True, 
-                text=True, 
-                check=False
-            )
+            help_text = _get_help_text(binary_path, binary_stat.st_mtime_ns)
             # Look for the backend in the output
             # Output format is usually: --db_backend string database backend: goleveldb | cleveldb ...
-            if "db_backend" in result.stdout:
-                return backend in result.stdout
+            if "db_backend" in help_text:
+                return backend in help_text
             return False
         except Exception as e:
-            print(f"Warning: Could not verify backend support: {e}")
+            log.warning(f"Warning: Could not verify backend support: {e}")
             return True # Assume supported if check fails to avoid blocking
 
     if args.backend == "treedb":
         if not check_backend_support(args.binary, "treedb"):
-            print("Warning: 'treedb' does not appear in 'gaiad --help'. Proceeding with 'treedb' as requested (may fail if unsupported).")
+            log.warning("Warning: 'treedb' does not appear in 'gaiad --help'. Proceeding with 'treedb' as requested (may fail if unsupported).")
             # args.backend = "goleveldb" # Allow user to try treedb even if check fails
         else:
-            print("Confirmed 'treedb' support in gaiad binary.")
+            log.info("Confirmed 'treedb' support in gaiad binary.")
 
     # Resolve home directory
     args.home = os.path.expanduser(args.home)
 
     # Clean home directory if requested
     if args.clean:
-        print("Cleaning requested. Checking for running gaiad processes...")
+        log.info("Cleaning requested. Checking for running gaiad processes...")
         try:
             # Kill running gaiad processes
-            subprocess.run(["pkill", "gaiad"], check=False)
-            time.sleep(3) # Give it a moment to terminate
+            stop_gaiad_processes()
         except Exception as e:
-            print(f"Warning: Failed to kill gaiad processes: {e}")
+            log.warning(f"Warning: Failed to kill gaiad processes: {e}")
 
-        if os.path.exists(args.home):
-            print(f"Cleaning home directory: {args.home}")
-            shutil.rmtree(args.home)
+        if _stat(args.home) is not None:
+            log.info(f"Cleaning home directory: {args.home}")
+            remove_tree(args.home)
 
     # Initialize node if config doesn't exist
     config_dir = os.path.join(args.home, "config")
@@ -181,12 +510,22 @@ def main():
     genesis_path = os.path.join(config_dir, "genesis.json")
 
     # If the home directory does not exist or we are cleaning, re-initialize
-    if not os.path.exists(config_dir) or args.clean:
-        print(f"Initializing node at {args.home}...")
+    initialize = args.clean or _stat(config_dir) is None
+    if initialize:
+        # The trust settings only depend on the remote RPC servers, so fetch them
+        # while the gaiad init/genesis commands below run
+        trust_settings = None
+        if args.state_sync_enable:
+            log.info("Fetching trust height and hash for state sync...")
+            trust_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            trust_settings = trust_executor.submit(get_trust_settings, args.state_sync_rpc_servers)
+            trust_executor.shutdown(wait=False)
+
+        log.info(f"Initializing node at {args.home}...")
         run_command([args.binary, "init", args.moniker, "--chain-id", CHAIN_ID, "--home", args.home])
         
         # Local Testnet Initialization (Replacing broken genesis download)
-        print("Configuring local testnet...")
+        log.info("Configuring local testnet...")
         
         # Create a validator key
         run_command([args.binary, "keys", "add", "validator", "--home", args.home, "--keyring-backend", "test", "--output", "json"])
@@ -197,88 +536,91 @@ def main():
         # Generate gentx
         run_command([args.binary, "genesis", "gentx", "validator", "100000000stake", "--chain-id", CHAIN_ID, "--home", args.home, "--keyring-backend", "test"])
         
-        # Collect gentxs
+        # Collect gentxs (each genesis step above depends on the previous one, so these stay sequential)
         run_command([args.binary, "genesis", "collect-gentxs", "--home", args.home])
-        
+    else:
+        log.info(f"Node already initialized at {args.home}. Skipping init.")
+
+    # Each branch below reads config.toml at most once and patches that text; it is written back at most once
+    config_updates = {}
+
+    if initialize:
         # Configure config.toml
-        print("Configuring config.toml...")
-        # Load as string first to handle potential comments or formatting not handled by toml.load directly
+        log.info("Configuring config.toml...")
+        # gaiad just wrote this file with defaults, so it is used as the template:
+        # only the lines below are read and rewritten, the document is never parsed
         with open(config_path, 'r') as f:
-            config_lines = f.readlines()
-
-        config_data = toml.load(config_path) # Load again for structured modification
+            config_text = f.read()
 
         # Set seeds
-        config_data['p2p']['seeds'] = SEEDS
-        config_data['p2p']['persistent_peers'] = "" # Clear persistent_peers if seeds are used
+        config_updates[('p2p', 'seeds')] = SEEDS
+        config_updates[('p2p', 'persistent_peers')] = "" # Clear persistent_peers if seeds are used
         
         # Set DB backend in config (though flag usually overrides, it's good practice)
-        config_data['db_backend'] = args.backend
+        config_updates[('', 'db_backend')] = args.backend
         
         # Apply port offset to config.toml
         if args.port_offset > 0:
-            print(f"Applying port offset of {args.port_offset} to config.toml...")
-            config_data['rpc']['laddr'] = increment_port(config_data['rpc']['laddr'], args.port_offset)
-            config_data['rpc']['pprof_laddr'] = increment_port(config_data['rpc']['pprof_laddr'], args.port_offset)
-            config_data['p2p']['laddr'] = increment_port(config_data['p2p']['laddr'], args.port_offset)
+            log.info(f"Applying port offset of {args.port_offset} to config.toml...")
+            port_keys = [('rpc', 'laddr'), ('rpc', 'pprof_laddr'), ('p2p', 'laddr')]
+            current_addrs = get_toml_values(config_text, port_keys)
+            addrs = batch_increment_ports([current_addrs[k] for k in port_keys], args.port_offset)
+            config_updates.update(zip(port_keys, addrs))
 
         # Configure State Sync if enabled
         if args.state_sync_enable:
-            print("Fetching trust height and hash for state sync...")
-            trust_height, trust_hash = get_trust_settings(args.state_sync_rpc_servers)
+            trust_height, trust_hash = trust_settings.result()
             
             if trust_height and trust_hash:
-                config_data['statesync']['enable'] = True
-                config_data['statesync']['rpc_servers'] = args.state_sync_rpc_servers
-                config_data['statesync']['trust_height'] = trust_height
-                config_data['statesync']['trust_hash'] = trust_hash
-                config_data['statesync']['trust_period'] = "168h" # 7 days
-                print(f"State sync enabled. Trust Height: {trust_height}, Trust Hash: {trust_hash}")
+                config_updates[('statesync', 'enable')] = True
+                config_updates[('statesync', 'rpc_servers')] = args.state_sync_rpc_servers
+                config_updates[('statesync', 'trust_height')] = trust_height
+                config_updates[('statesync', 'trust_hash')] = trust_hash
+                config_updates[('statesync', 'trust_period')] = "168h" # 7 days
+                log.info(f"State sync enabled. Trust Height: {trust_height}, Trust Hash: {trust_hash}")
             else:
-                print("Warning: Could not enable state sync due to missing trust settings.")
-                config_data['statesync']['enable'] = False
+                log.warning("Warning: Could not enable state sync due to missing trust settings.")
+                config_updates[('statesync', 'enable')] = False
         else:
-            config_data['statesync']['enable'] = False
-            config_data['statesync']['rpc_servers'] = "" # Clear if not using state sync
+            config_updates[('statesync', 'enable')] = False
+            config_updates[('statesync', 'rpc_servers')] = "" # Clear if not using state sync
 
-        # Write the modified config back
-        with open(config_path, 'w') as f:
-            toml.dump(config_data, f)
+    elif not file_matches(config_path, re.compile(rb'^db_backend\s*=\s*"' + re.escape(args.backend.encode()) + rb'"', re.M)):
+        # Ensure the selected backend is reflected in config.toml for consistency, even if not re-initializing.
+        # On a restart with the same backend the mmap scan above avoids reading and parsing the file at all.
+        with open(config_path, 'r') as f:
+            config_text = f.read()
+        config_updates[('', 'db_backend')] = args.backend
+        log.info(f"Updated config.toml to use backend: {args.backend}")
+
+    # Write the modified config back, keeping gaiad's comments and layout
+    if config_updates:
+        write_file_atomic(config_path, patch_toml(config_text, config_updates))
 
+    if initialize:
         # Configure app.toml
-        print(f"Configuring app.toml with min-gas-prices: {MIN_GAS_PRICE}...")
-        app_data = toml.load(app_config_path)
+        log.info(f"Configuring app.toml with min-gas-prices: {MIN_GAS_PRICE}...")
+        with open(app_config_path, 'r') as f:
+            app_text = f.read()
+        app_data = parse_toml(app_text)
         
-        app_data['minimum-gas-prices'] = MIN_GAS_PRICE
+        app_updates = {('', 'minimum-gas-prices'): MIN_GAS_PRICE}
         
         # Apply port offset to app.toml
         if args.port_offset > 0:
-            print(f"Applying port offset of {args.port_offset} to app.toml...")
-            if 'api' in app_data:
-                app_data['api']['address'] = increment_port(app_data['api'].get('address', 'tcp://0.0.0.0:1317'), args.port_offset)
-            if 'grpc' in app_data:
-                app_data['grpc']['address'] = increment_port(app_data['grpc'].get('address', '0.0.0.0:9090'), args.port_offset)
-            if 'grpc-web' in app_data:
-                 app_data['grpc-web']['address'] = increment_port(app_data['grpc-web'].get('address', '0.0.0.0:9091'), args.port_offset)
+            log.info(f"Applying port offset of {args.port_offset} to app.toml...")
+            default_addrs = {'api': 'tcp://0.0.0.0:1317', 'grpc': '0.0.0.0:9090', 'grpc-web': '0.0.0.0:9091'}
+            tables = [table for table in default_addrs if table in app_data]
+            addrs = batch_increment_ports([app_data[table].get('address', default_addrs[table]) for table in tables], args.port_offset)
+            app_updates.update(((table, 'address'), addr) for table, addr in zip(tables, addrs))
         
-        with open(app_config_path, 'w') as f:
-            toml.dump(app_data, f)
+        write_file_atomic(app_config_path, patch_toml(app_text, app_updates))
             
-        print("Configuration complete.")
-
-    else:
-        print(f"Node already initialized at {args.home}. Skipping init.")
-        # Ensure the selected backend is reflected in config.toml for consistency, even if not re-initializing
-        config_data = toml.load(config_path)
-        if config_data['db_backend'] != args.backend:
-            config_data['db_backend'] = args.backend
-            with open(config_path, 'w') as f:
-                toml.dump(config_data, f)
-            print(f"Updated config.toml to use backend: {args.backend}")
+        log.info("Configuration complete.")
 
 
     # Start the node
-    print(f"Starting node with backend: {args.backend}")
+    log.info(f"Starting node with backend: {args.backend}")
     start_cmd = [
         args.binary, "start",
         "--home", args.home,
@@ -286,26 +628,26 @@ def main():
     ]
     
     if args.disable_fastnode:
-        print("Disabling IAVL fast node...")
+        log.info("Disabling IAVL fast node...")
         start_cmd.append("--iavl-disable-fastnode")
 
     if args.halt_height > 0:
-        print(f"Setting halt height to {args.halt_height}...")
+        log.info(f"Setting halt height to {args.halt_height}...")
         start_cmd.append(f"--halt-height={args.halt_height}")
 
     if args.unsafe_skip_upgrades > 0:
-        print(f"SKIPPING UPGRADE at height {args.unsafe_skip_upgrades} (unsafe)...")
+        log.info(f"SKIPPING UPGRADE at height {args.unsafe_skip_upgrades} (unsafe)...")
         start_cmd.append(f"--unsafe-skip-upgrades={args.unsafe_skip_upgrades}")
     
     # Check if we are state syncing, if so we might need unsafe-reset-all (if not already done by init/previous run)
-    if args.state_sync_enable and (not os.path.exists(os.path.join(args.home, "data", "priv_validator_state.json"))):
-        print("Performing unsafe-reset-all for state sync preparation...")
+    if args.state_sync_enable and _stat(os.path.join(args.home, "data", "priv_validator_state.json")) is None:
+        log.info("Performing unsafe-reset-all for state sync preparation...")
         run_command([args.binary, "tendermint", "unsafe-reset-all", "--home", args.home])
 
     try:
         run_command(start_cmd)
     except KeyboardInterrupt:
-        print("\nNode stopped.")
+        log.info("\nNode stopped.")
 
 if __name__ == "__main__":
     main()